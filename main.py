@@ -1,23 +1,77 @@
 import os
+import re
+import hashlib
+import mmap
+import bisect
 import json
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 import time
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
-from PyPDF2 import PdfReader
+import fitz
 import pymongo
-from pymongo import MongoClient, UpdateOne
+from pymongo import MongoClient, InsertOne, UpdateOne
+from bson import ObjectId
 import spacy
+from spacy.tokens import Doc
 from collections import Counter
 from datetime import datetime
 import psutil
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+import numpy as np
+from numba import njit
+from pymongo.errors import BulkWriteError, ConnectionFailure, ServerSelectionTimeoutError
 from dotenv import load_dotenv
 
 load_dotenv()
 
+_HAS_DIGIT = re.compile(r'\d').search
+# Lemmas are never used; tagger/attribute_ruler are kept for noun_chunks
+_NLP_DISABLED_PIPES = ('lemmatizer',)
+
+
+@lru_cache(maxsize=1)
+def _get_nlp(disable: Tuple[str, ...] = _NLP_DISABLED_PIPES):
+    """Load the spaCy pipeline once per process"""
+    return spacy.load('en_core_web_sm', disable=list(disable))
+
+
+def _warm_nlp() -> None:
+    """Worker initializer that loads the spaCy pipeline before any task runs"""
+    _get_nlp()
+
+
+@lru_cache(maxsize=8)
+def _get_client(uri: str) -> MongoClient:
+    """Share one pooled MongoClient per URI within a process"""
+    return MongoClient(
+        uri,
+        serverSelectionTimeoutMS=30000,
+        connectTimeoutMS=30000,
+        socketTimeoutMS=30000,
+        retryWrites=True,
+        retryReads=True,
+        w='majority',
+        maxPoolSize=50,
+        waitQueueTimeoutMS=30000
+    )
+
+
+@njit(cache=True, fastmath=True)
+def _score_sentences(counts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Score sentences on position, length and word importance in a single pass"""
+    n = counts.shape[0]
+    scores = np.empty(n, np.float64)
+    inv_n = 1.0 / max(n, 1)
+    for i in range(n):
+        position_score = 1.0 - i * inv_n
+        length_score = min(1.0, counts[i] / 20.0)  # Normalize long sentences
+        word_importance = lengths[i] / max(counts[i], 1)
+        scores[i] = (position_score + length_score + word_importance) / 3.0
+    return scores
+
+
 @dataclass
 class ProcessingConfig:
     """Configuration for document processing based on document size"""
@@ -33,86 +87,91 @@ class ProcessingConfig:
 
 class DocumentProcessor:
     """Base class for document processing operations"""
+    KEYWORD_ENT_LABELS = frozenset({'ORG', 'PRODUCT', 'WORK_OF_ART', 'EVENT', 'LAW'})
+
     def __init__(self):
-        self.nlp = spacy.load('en_core_web_sm')
+        self.nlp = _get_nlp()
         self.config = ProcessingConfig()
+        # Per-size lookup tables indexed by _size_bucket: short, medium, long
+        self._thresholds = (self.config.SHORT_DOC_THRESHOLD, self.config.MEDIUM_DOC_THRESHOLD)
+        self._summary_ratios = (
+            self.config.SHORT_SUMMARY_RATIO,
+            self.config.MEDIUM_SUMMARY_RATIO,
+            self.config.LONG_SUMMARY_RATIO
+        )
+        self._max_keywords = tuple(self.config.MAX_KEYWORDS[size] for size in ('small', 'medium', 'large'))
+
+    def _size_bucket(self, page_count: int) -> int:
+        """Index of the document size bucket; thresholds are inclusive upper bounds"""
+        return bisect.bisect_left(self._thresholds, page_count)
 
     def get_summary_ratio(self, page_count: int) -> float:
         """Determine summary ratio based on document length"""
-        if page_count <= self.config.SHORT_DOC_THRESHOLD:
-            return self.config.SHORT_SUMMARY_RATIO
-        elif page_count <= self.config.MEDIUM_DOC_THRESHOLD:
-            return self.config.MEDIUM_SUMMARY_RATIO
-        return self.config.LONG_SUMMARY_RATIO
+        return self._summary_ratios[self._size_bucket(page_count)]
+
+    def get_max_keywords(self, page_count: int) -> int:
+        """Determine keyword limit based on document length"""
+        return self._max_keywords[self._size_bucket(page_count)]
+
+    def analyse(self, text: str, page_count: int) -> Tuple[str, List[str]]:
+        """Parse text once and derive both summary and keywords from the Doc"""
+        doc = self.nlp(text)
+        return self.generate_summary(doc, page_count), self.extract_keywords(doc, page_count)
 
-    def generate_summary(self, text: str, page_count: int) -> str:
+    def generate_summary(self, doc: Doc, page_count: int) -> str:
         """Generate dynamic summary based on document length"""
         try:
-            doc = self.nlp(text)
             sentences = list(doc.sents)
             
             # Calculate summary length based on document size
             ratio = self.get_summary_ratio(page_count)
             summary_length = max(3, int(len(sentences) * ratio))
             
-            # Calculate sentence importance scores
-            sentence_scores = {}
-            for sent in sentences:
-                words = [token.text.lower() for token in sent if not token.is_stop]
-                if words:
-                    # Enhanced scoring considering sentence position and length
-                    position_score = 1.0 - (sentences.index(sent) / len(sentences))
-                    length_score = min(1.0, len(words) / 20)  # Normalize long sentences
-                    word_importance = sum(len(word) for word in words) / len(words)
-                    sentence_scores[sent] = (position_score + length_score + word_importance) / 3
+            # Collect non-stopword counts and total word lengths per sentence
+            word_lengths = [[len(token.text) for token in sent if not token.is_stop]
+                            for sent in sentences]
+            counts = np.fromiter(map(len, word_lengths), dtype=np.int32, count=len(sentences))
+            lengths = np.fromiter(map(sum, word_lengths), dtype=np.int32, count=len(sentences))
             
-            # Select and order top sentences
-            top_sentences = sorted(sentence_scores.items(), 
-                                 key=lambda x: x[1], 
-                                 reverse=True)[:summary_length]
+            # Enhanced scoring considering sentence position and length
+            scores = _score_sentences(counts, lengths)
             
-            summary = ' '.join([str(sent[0]) for sent in sorted(top_sentences, 
-                              key=lambda x: sentences.index(x[0]))])
+            # Select top sentences (ignoring stopword-only ones) and restore document order
+            candidates = np.flatnonzero(counts)
+            if summary_length < len(candidates):
+                top = np.argpartition(-scores[candidates], summary_length - 1)[:summary_length]
+                candidates = np.sort(candidates[top])
+            
+            summary = ' '.join(str(sentences[i]) for i in candidates)
             return summary
         except Exception as e:
             logging.error(f"Summary generation error: {str(e)}")
             raise
 
-    def extract_keywords(self, text: str,page_count) -> List[str]:
+    def extract_keywords(self, doc: Doc, page_count: int) -> List[str]:
         """Extract domain-specific keywords with enhanced filtering"""
         try:
-            doc = self.nlp(text)
-            keywords = []
+            keyword_freq = Counter()
             
-            # Extract noun phrases and named entities
+            # Count noun phrases and named entities
             for chunk in doc.noun_chunks:
                 if not any(token.is_stop for token in chunk):
-                    keywords.append(chunk.text.lower())
+                    keyword_freq[chunk.text.lower()] += 1
             
             for ent in doc.ents:
-                if ent.label_ in ['ORG', 'PRODUCT', 'WORK_OF_ART', 'EVENT', 'LAW']:
-                    keywords.append(ent.text.lower())
-            
-            # Count and filter keywords
-            keyword_freq = Counter(keywords)
+                if ent.label_ in self.KEYWORD_ENT_LABELS:
+                    keyword_freq[ent.text.lower()] += 1
             
             # Get max keywords based on page count
-            if page_count < 10:
-                max_keywords = self.config.MAX_KEYWORDS['small']
-            elif 10 <= page_count <= 50:
-                max_keywords = self.config.MAX_KEYWORDS['medium']
-            else:
-                max_keywords = self.config.MAX_KEYWORDS['large']
+            max_keywords = self.get_max_keywords(page_count)
             
             # Enhanced filtering criteria
-            filtered_keywords = [
+            return [
                 word for word, freq in keyword_freq.most_common(max_keywords)
                 if len(word) > 3 
                 and freq >= self.config.MIN_KEYWORD_FREQ
-                and not any(char.isdigit() for char in word)
+                and not _HAS_DIGIT(word)
             ]
-            
-            return filtered_keywords[:max_keywords]
         except Exception as e:
             logging.error(f"Keyword extraction error: {str(e)}")
             raise
@@ -120,21 +179,11 @@ class DocumentProcessor:
 class MongoDBHandler:
     """Handle all MongoDB operations"""
     def __init__(self, uri: str, db_name: str, collection_name: str):
-        self.client = MongoClient(
-            uri,
-            serverSelectionTimeoutMS=30000,
-            connectTimeoutMS=30000,
-            socketTimeoutMS=30000,
-            retryWrites=True,
-            retryReads=True,
-            w='majority',
-            maxPoolSize=50,
-            waitQueueTimeoutMS=30000
-        )
+        self.client = _get_client(uri)
         self.db = self.client[db_name]
         self.collection = self.db[collection_name]
-        self.lock = threading.Lock()
         self._test_connection()
+        self._ensure_indexes()
 
     def _test_connection(self):
         """Test MongoDB connection"""
@@ -144,37 +193,61 @@ class MongoDBHandler:
             logging.error(f"MongoDB connection failed: {str(e)}")
             raise
 
+    def _ensure_indexes(self):
+        """Ensure a completed file is stored only once per content hash"""
+        try:
+            self.collection.create_index(
+                "file_hash",
+                unique=True,
+                partialFilterExpression={
+                    "file_hash": {"$exists": True},
+                    "processing_status": "completed"
+                }
+            )
+        except Exception as e:
+            logging.error(f"MongoDB index creation error: {str(e)}")
+            raise
+
+    def find_processed(self, file_hashes: List[str]) -> Dict[str, ObjectId]:
+        """Map content hashes of already completed documents to their ids"""
+        try:
+            cursor = self.collection.find(
+                {"file_hash": {"$in": file_hashes}, "processing_status": "completed"},
+                {"file_hash": 1}
+            )
+            return {doc["file_hash"]: doc["_id"] for doc in cursor}
+        except Exception as e:
+            logging.error(f"MongoDB lookup error: {str(e)}")
+            raise
+
     def store_document(self, metadata: Dict) -> str:
         """Store initial document record"""
-        with self.lock:
-            try:
-                result = self.collection.insert_one(metadata)
-                return result.inserted_id
-            except Exception as e:
-                logging.error(f"MongoDB storage error: {str(e)}")
-                raise
+        try:
+            result = self.collection.insert_one(metadata)
+            return result.inserted_id
+        except Exception as e:
+            logging.error(f"MongoDB storage error: {str(e)}")
+            raise
 
     def update_document(self, doc_id: str, update_data: Dict) -> None:
         """Update document record with processing results"""
-        with self.lock:
-            try:
-                self.collection.update_one(
-                    {"_id": doc_id},
-                    {"$set": update_data}
-                )
-            except Exception as e:
-                logging.error(f"MongoDB update error: {str(e)}")
-                raise
+        try:
+            self.collection.update_one(
+                {"_id": doc_id},
+                {"$set": update_data}
+            )
+        except Exception as e:
+            logging.error(f"MongoDB update error: {str(e)}")
+            raise
 
-    def batch_update(self, updates: List[UpdateOne]) -> None:
+    def batch_update(self, updates: List[Union[InsertOne, UpdateOne]]) -> None:
         """Perform batch updates to MongoDB"""
-        with self.lock:
-            try:
-                if updates:
-                    self.collection.bulk_write(updates, ordered=False)
-            except Exception as e:
-                logging.error(f"MongoDB batch update error: {str(e)}")
-                raise
+        try:
+            if updates:
+                self.collection.bulk_write(updates, ordered=False)
+        except Exception as e:
+            logging.error(f"MongoDB batch update error: {str(e)}")
+            raise
 
 
 class PDFProcessor:
@@ -206,86 +279,195 @@ class PDFProcessor:
             return result
         return wrapper
 
-    def _extract_text_and_metadata(self, file_path: str) -> Tuple[str, Dict]:
+    @staticmethod
+    def _hash_file(file_path: str) -> str:
+        """Compute the SHA-256 content hash of a file via mmap"""
+        with open(file_path, 'rb') as file, \
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return hashlib.sha256(mapped).hexdigest()
+
+    @staticmethod
+    def _extract_text_and_metadata(file_path: str) -> Tuple[str, Dict]:
         """Extract text and metadata from PDF"""
         try:
-            with open(file_path, 'rb') as file:
-                reader = PdfReader(file)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
-                
-                metadata = {
-                    "filename": os.path.basename(file_path),
-                    "file_path": file_path,
-                    "file_size": os.path.getsize(file_path),
-                    "page_count": len(reader.pages),
-                    "creation_date": datetime.now().isoformat(),
-                    "processing_status": "pending"
-                }
-                
-                return text, metadata
+            pdf = fitz.open(file_path)
+            try:
+                text = "\n".join(page.get_text("text") for page in pdf)
+                page_count = pdf.page_count
+            finally:
+                pdf.close()
+            
+            metadata = {
+                "filename": os.path.basename(file_path),
+                "file_path": file_path,
+                "file_size": os.path.getsize(file_path),
+                "page_count": page_count,
+                "creation_date": datetime.now().isoformat(),
+                "processing_status": "pending"
+            }
+            
+            return text, metadata
         except Exception as e:
             logging.error(f"PDF extraction error for {file_path}: {str(e)}")
             raise
 
+    def _complete_document(self, file_path: str, doc_id, summary: str, keywords: List[str]) -> Dict:
+        """Update a stored record with processing results"""
+        update_data = {
+            "summary": summary,
+            "keywords": keywords,
+            "processing_status": "completed",
+            "last_updated": datetime.now().isoformat()
+        }
+        self.db_handler.update_document(doc_id, update_data)
+        
+        return {
+            "status": "success",
+            "file": file_path,
+            "doc_id": str(doc_id),
+            "summary_length": len(summary),
+            "keyword_count": len(keywords)
+        }
+
+    @staticmethod
+    def _skipped(file_path: str, doc_id) -> Dict:
+        """Result for a file whose content was already processed"""
+        result = {"status": "skipped", "file": file_path, "doc_id": str(doc_id)}
+        logging.info(f"Skipping already processed document: {result}")
+        return result
+
     @monitor_performance
     def process_single_pdf(self, file_path: str) -> Dict:
         """Process a single PDF file"""
         try:
+            # Skip files whose content has already been processed
+            file_hash = self._hash_file(file_path)
+            processed = self.db_handler.find_processed([file_hash])
+            if file_hash in processed:
+                return self._skipped(file_path, processed[file_hash])
+            
             # Extract text and metadata
             text, metadata = self._extract_text_and_metadata(file_path)
+            metadata["file_hash"] = file_hash
             
             # Store initial record
             doc_id = self.db_handler.store_document(metadata)
             
             # Process content
-            summary = self.doc_processor.generate_summary(text, metadata['page_count'])
-            keywords = self.doc_processor.extract_keywords(text,metadata['page_count'])
+            summary, keywords = self.doc_processor.analyse(text, metadata['page_count'])
             
             # Update record
-            update_data = {
-                "summary": summary,
-                "keywords": keywords,
-                "processing_status": "completed",
-                "last_updated": datetime.now().isoformat()
-            }
-            self.db_handler.update_document(doc_id, update_data)
-            
-            return {
-                "status": "success",
-                "file": file_path,
-                "doc_id": str(doc_id),
-                "summary_length": len(summary),
-                "keyword_count": len(keywords)
-            }
+            return self._complete_document(file_path, doc_id, summary, keywords)
         except Exception as e:
             logging.error(f"Processing error for {file_path}: {str(e)}")
             return {"status": "error", "file": file_path, "error": str(e)}
 
     @monitor_performance
     def process_folder(self, folder_path: str, max_workers: int = 10) -> List[Dict]:
-        """Process all PDFs in the specified folder concurrently"""
+        """Process all PDFs in the specified folder across worker processes"""
         pdf_files = [f for f in os.listdir(folder_path) if f.lower().endswith('.pdf')]
         results = []
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = []
-            for pdf_file in pdf_files:
-                file_path = os.path.join(folder_path, pdf_file)
-                futures.append(executor.submit(self.process_single_pdf, file_path))
+        # Hash every file up front so unchanged ones are skipped with one lookup
+        file_hashes = {}
+        for pdf_file in pdf_files:
+            file_path = os.path.join(folder_path, pdf_file)
+            try:
+                file_hashes[file_path] = self._hash_file(file_path)
+            except Exception as e:
+                logging.error(f"Hashing error for {file_path}: {str(e)}")
+                results.append({"status": "error", "file": file_path, "error": str(e)})
+        processed = self.db_handler.find_processed(list(set(file_hashes.values())))
+        
+        batch = []
+        
+        # Extraction and NLP are CPU bound, so they run in worker processes;
+        # database writes stay in this process and are flushed in bulk
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_warm_nlp) as executor:
+            futures = {}
+            pending_hashes = {}
+            for file_path, file_hash in file_hashes.items():
+                if file_hash in processed:
+                    results.append(self._skipped(file_path, processed[file_hash]))
+                elif file_hash in pending_hashes:
+                    # Duplicate content within this folder is only processed once
+                    results.append({
+                        "status": "skipped",
+                        "file": file_path,
+                        "duplicate_of": pending_hashes[file_hash]
+                    })
+                else:
+                    pending_hashes[file_hash] = file_path
+                    futures[executor.submit(_analyse_pdf, file_path)] = file_path
             
             for future in as_completed(futures):
+                file_path = futures[future]
                 try:
-                    result = future.result()
-                    results.append(result)
-                    logging.info(f"Processed document: {result}")
+                    metadata, summary, keywords = future.result()
                 except Exception as e:
-                    logging.error(f"Error in future: {str(e)}")
+                    logging.error(f"Processing error for {file_path}: {str(e)}")
+                    results.append({"status": "error", "file": file_path, "error": str(e)})
+                    continue
+                
+                # Generate the id client-side so the record is written in one operation
+                document = {
+                    **metadata,
+                    "_id": ObjectId(),
+                    "file_hash": file_hashes[file_path],
+                    "summary": summary,
+                    "keywords": keywords,
+                    "processing_status": "completed"
+                }
+                batch.append((file_path, document))
+                if len(batch) >= self.config.BATCH_SIZE:
+                    results.extend(self._flush_batch(batch))
+                    batch = []
+        
+        results.extend(self._flush_batch(batch))
+        return results
+
+    def _flush_batch(self, batch: List[Tuple[str, Dict]]) -> List[Dict]:
+        """Insert processed documents with a single unordered bulk write"""
+        if not batch:
+            return []
+        
+        # One timestamp for the whole flush
+        now = datetime.now().isoformat()
+        for _, document in batch:
+            document["last_updated"] = now
+        
+        failed = {}
+        try:
+            self.db_handler.batch_update([InsertOne(document) for _, document in batch])
+        except BulkWriteError as e:
+            failed = {err['index']: err['errmsg'] for err in e.details.get('writeErrors', [])}
+        except Exception as e:
+            failed = {index: str(e) for index in range(len(batch))}
         
+        results = []
+        for index, (file_path, document) in enumerate(batch):
+            if index in failed:
+                result = {"status": "error", "file": file_path, "error": failed[index]}
+            else:
+                result = {
+                    "status": "success",
+                    "file": file_path,
+                    "doc_id": str(document["_id"]),
+                    "summary_length": len(document["summary"]),
+                    "keyword_count": len(document["keywords"])
+                }
+            results.append(result)
+            logging.info(f"Processed document: {result}")
         return results
 
 
+def _analyse_pdf(file_path: str) -> Tuple[Dict, str, List[str]]:
+    """Extract and analyse a PDF inside a worker process"""
+    text, metadata = PDFProcessor._extract_text_and_metadata(file_path)
+    summary, keywords = DocumentProcessor().analyse(text, metadata['page_count'])
+    return metadata, summary, keywords
+
+
 if __name__ == "__main__":
     # Configure logging
     logging.basicConfig(
@@ -310,9 +492,11 @@ if __name__ == "__main__":
     # Log summary
     success_count = sum(1 for r in results if r['status'] == 'success')
     error_count = sum(1 for r in results if r['status'] == 'error')
+    skipped_count = sum(1 for r in results if r['status'] == 'skipped')
     logging.info(f"""
     Processing Summary:
     - Total documents: {len(results)}
     - Successful: {success_count}
+    - Skipped (already processed): {skipped_count}
     - Failed: {error_count}
     """)
\ No newline at end of file
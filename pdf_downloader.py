@@ -1,6 +1,8 @@
 import os
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 # Specify the folder containing the json file
 json_file_path = 'pdf.json'
@@ -8,6 +10,12 @@ json_file_path = 'pdf.json'
 # Folder where PDFs will be saved
 save_folder = 'pdfs'
 
+# Number of concurrent downloads (also the size of the connection pool)
+max_workers = 16
+
+# Size of each chunk streamed to disk
+chunk_size = 1 << 16
+
 # Create the folder if it doesn't exist
 if not os.path.exists(save_folder):
     os.makedirs(save_folder)
@@ -16,24 +24,33 @@ if not os.path.exists(save_folder):
 with open(json_file_path, 'r') as f:
     pdfs = json.load(f)
 
+# Share one session so connections are kept alive and reused across downloads
+session = requests.Session()
+adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+session.mount('http://', adapter)
+session.mount('https://', adapter)
+
 # Function to download and save PDFs
 def download_pdf(url, save_path):
     try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            with open(save_path, 'wb') as f:
-                f.write(response.content)
-            print(f'Successfully downloaded: {save_path}')
-        else:
-            print(f'Failed to download {url} (Status Code: {response.status_code})')
+        with session.get(url, stream=True, timeout=60) as response:
+            if response.status_code == 200:
+                # Stream the body straight to disk instead of buffering it in memory
+                with open(save_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        f.write(chunk)
+                print(f'Successfully downloaded: {save_path}')
+            else:
+                print(f'Failed to download {url} (Status Code: {response.status_code})')
     except Exception as e:
         print(f'Error downloading {url}: {e}')
 
-# Iterate over the URLs in the json and download them
-for pdf_key, pdf_url in pdfs.items():
-    # Create a file name based on the key (pdf1, pdf2, etc.)
-    file_name = f'{pdf_key}.pdf'
-    save_path = os.path.join(save_folder, file_name)
+# Download the URLs in the json concurrently
+with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    for pdf_key, pdf_url in pdfs.items():
+        # Create a file name based on the key (pdf1, pdf2, etc.)
+        file_name = f'{pdf_key}.pdf'
+        save_path = os.path.join(save_folder, file_name)
 
-    # Download and save the file
-    download_pdf(pdf_url, save_path)
+        # Download and save the file
+        executor.submit(download_pdf, pdf_url, save_path)
@@ -55,8 +55,18 @@ class TestPDFPipeline(unittest.TestCase):
             logging.error(f"Failed to initialize PDFProcessor: {str(e)}")
             raise
         
-        # Performance metrics storage
-        cls.performance_metrics = []
+        # Performance metrics storage, one column per metric
+        cls.metrics = {
+            'filename': [],
+            'file_size': [],
+            'processing_time': [],
+            'memory_used': [],
+            'summary_length': [],
+            'keyword_count': [],
+            'quality_metrics': [],
+            'timestamp': []
+        }
+        cls.concurrent_metrics = {}
         
         # Store initial file information
         cls.file_info = {}
@@ -177,7 +187,7 @@ class TestPDFPipeline(unittest.TestCase):
                 quality_metrics = self._analyze_content_quality(doc)
                 
                 # Store comprehensive metrics
-                self.performance_metrics.append({
+                file_metrics = {
                     'filename': os.path.basename(file_path),
                     'file_size': self.file_info[file_path]['size'],
                     'processing_time': float(processing_time),
@@ -186,7 +196,9 @@ class TestPDFPipeline(unittest.TestCase):
                     'keyword_count': len(list(doc.get('keywords', []))),
                     'quality_metrics': quality_metrics,
                     'timestamp': datetime.now().isoformat()
-                })
+                }
+                for key, value in file_metrics.items():
+                    self.metrics[key].append(value)
                 
                 # Log individual file results
                 logging.info(f"""
@@ -221,14 +233,12 @@ class TestPDFPipeline(unittest.TestCase):
             self.assertEqual(success_count, len(self.test_files))
             
             # Store concurrent processing metrics
-            self.performance_metrics.append({
-                'concurrent_processing': {
-                    'total_time': float(total_time),
-                    'avg_time_per_doc': float(total_time / len(results)),
-                    'total_memory_mb': float(total_memory / (1024 * 1024)),
-                    'documents_processed': int(len(results)),
-                    'timestamp': datetime.now().isoformat()
-                }
+            self.concurrent_metrics.update({
+                'total_time': float(total_time),
+                'avg_time_per_doc': float(total_time / len(results)),
+                'total_memory_mb': float(total_memory / (1024 * 1024)),
+                'documents_processed': int(len(results)),
+                'timestamp': datetime.now().isoformat()
             })
             
         except Exception as e:
@@ -236,15 +246,15 @@ class TestPDFPipeline(unittest.TestCase):
             raise
 
     @classmethod
-    def _create_visualizations(cls, metrics: List[Dict]):
+    def _create_visualizations(cls, metrics: Dict[str, List]):
         """Create performance visualization plots"""
         try:
             # Processing time vs file size
             plt.figure(figsize=(10, 6))
-            sizes = [float(m['file_size']) / (1024 * 1024) for m in metrics if 'file_size' in m]
-            times = [float(m['processing_time']) for m in metrics if 'processing_time' in m]
+            sizes = np.asarray(metrics['file_size'], dtype=float) / (1024 * 1024)
+            times = np.asarray(metrics['processing_time'], dtype=float)
             
-            if sizes and times:
+            if sizes.size and times.size:
                 plt.scatter(sizes, times)
                 plt.xlabel('File Size (MB)')
                 plt.ylabel('Processing Time (seconds)')
@@ -254,10 +264,10 @@ class TestPDFPipeline(unittest.TestCase):
             
             # Memory usage comparison
             plt.figure(figsize=(10, 6))
-            names = [str(m['filename']) for m in metrics if 'filename' in m]
-            memory = [float(m['memory_used']) / (1024 * 1024) for m in metrics if 'memory_used' in m]
+            names = [str(name) for name in metrics['filename']]
+            memory = np.asarray(metrics['memory_used'], dtype=float) / (1024 * 1024)
             
-            if names and memory:
+            if names and memory.size:
                 plt.bar(names, memory)
                 plt.xlabel('Files')
                 plt.ylabel('Memory Usage (MB)')
@@ -268,11 +278,11 @@ class TestPDFPipeline(unittest.TestCase):
             plt.close()
             
             # Content quality metrics
-            if all('quality_metrics' in m for m in metrics):
+            if metrics['quality_metrics']:
                 plt.figure(figsize=(10, 6))
                 quality_metrics = pd.DataFrame(
-                    [m['quality_metrics'] for m in metrics],
-                    index=[m['filename'] for m in metrics]
+                    metrics['quality_metrics'],
+                    index=metrics['filename']
                 )
                 quality_metrics.plot(kind='bar', figsize=(10, 6))
                 plt.xlabel('Files')
@@ -291,23 +301,22 @@ class TestPDFPipeline(unittest.TestCase):
         """Generate detailed performance report with visualizations"""
         try:
             # Calculate aggregate metrics
-            sequential_metrics = [m for m in cls.performance_metrics if 'filename' in m]
-            concurrent_metrics = [m for m in cls.performance_metrics if 'concurrent_processing' in m]
+            processing_times = np.asarray(cls.metrics['processing_time'], dtype=float)
+            memory_used = np.asarray(cls.metrics['memory_used'], dtype=float)
             
-            if sequential_metrics:
+            if processing_times.size:
                 report_data = {
                     'timestamp': datetime.now().isoformat(),
                     'summary': {
                         'total_files_processed': len(cls.test_files),
                         'sequential_processing': {
-                            'avg_time': float(np.mean([m['processing_time'] for m in sequential_metrics])),
-                            'avg_memory': float(np.mean([m['memory_used'] for m in sequential_metrics])),
-                            'min_time': float(np.min([m['processing_time'] for m in sequential_metrics])),
-                            'max_time': float(np.max([m['processing_time'] for m in sequential_metrics]))
+                            'avg_time': float(processing_times.mean()),
+                            'avg_memory': float(memory_used.mean()),
+                            'min_time': float(processing_times.min()),
+                            'max_time': float(processing_times.max())
                         },
-                        'concurrent_processing': concurrent_metrics[0]['concurrent_processing']
-                        if concurrent_metrics else {},
-                        'file_specific_metrics': sequential_metrics
+                        'concurrent_processing': cls.concurrent_metrics,
+                        'file_specific_metrics': cls.metrics
                     }
                 }
                 
@@ -316,7 +325,7 @@ class TestPDFPipeline(unittest.TestCase):
                     json.dump(report_data, f, indent=2)
                 
                 # Create visualizations
-                cls._create_visualizations(sequential_metrics)
+                cls._create_visualizations(cls.metrics)
                 
                 # Generate summary log
                 logging.info(f"""